@@ -0,0 +1,49 @@
+"""
+Shared OpenRouter client construction. Building an OpenAI client sets up an
+HTTP pool and SSL context, so we build it once per API key and reuse it.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+from typing import Any, Optional
+
+try:
+    from openai import OpenAI  # type: ignore
+except ImportError:
+    OpenAI = None
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+
+@functools.lru_cache(maxsize=1)
+def _build_client(api_key: str) -> Optional["OpenAI"]:
+    try:
+        return OpenAI(base_url=OPENROUTER_BASE_URL, api_key=api_key)
+    except Exception as exc:
+        logger.error("Failed to init OpenRouter client: %s", exc)
+        return None
+
+
+def get_openrouter_client() -> Optional["OpenAI"]:
+    """Return a cached OpenRouter client, or None when unavailable/misconfigured."""
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if OpenAI is None or not api_key:
+        return None
+    return _build_client(api_key)
+
+
+def dumps_prompt(payload: Any) -> str:
+    """Pretty-print a prompt payload as JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(payload, indent=2)
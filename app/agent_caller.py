@@ -6,18 +6,217 @@ alignment with production behavior.
 """
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
 import json
+import logging
 import os
+import time
 import uuid
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
 try:
     import httpx  # type: ignore
 except ImportError:
     httpx = None
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+from . import file_utils
 from .models import AgentMetadata, AgentRequest, AgentResponse, ErrorModel, OutputModel
 
+logger = logging.getLogger(__name__)
+
+# Shared client so connection pooling/keep-alive persists across agent calls.
+# Per-agent timeouts are applied on each request instead of on the client.
+_CLIENT: "httpx.AsyncClient | None" = None
+
+
+# Per-agent circuit breaker: {agent_name: (consecutive_failures, open_until)}.
+# After _BREAKER_THRESHOLD failures within _BREAKER_COOLDOWN_S of each other the
+# agent is skipped until open_until; the next call after that is a trial.
+_BREAKER_THRESHOLD = 5
+_BREAKER_COOLDOWN_S = 30.0
+_BREAKER: Dict[str, Tuple[int, float]] = {}
+
+# Agents with accepts_multipart get raw file parts once any upload decodes to
+# more than this; smaller files stay base64 in the JSON handshake.
+MULTIPART_MIN_BYTES = 1024 * 1024
+
+
+def _breaker_open(agent_name: str) -> bool:
+    state = _BREAKER.get(agent_name)
+    return state is not None and state[0] >= _BREAKER_THRESHOLD and time.monotonic() < state[1]
+
+
+def _record_failure(agent_name: str) -> None:
+    now = time.monotonic()
+    failures, open_until = _BREAKER.get(agent_name, (0, 0.0))
+    if now >= open_until and failures < _BREAKER_THRESHOLD:
+        # Previous failures are too old to count as consecutive.
+        failures = 0
+    _BREAKER[agent_name] = (failures + 1, now + _BREAKER_COOLDOWN_S)
+
+
+def _record_success(agent_name: str) -> None:
+    _BREAKER.pop(agent_name, None)
+
+
+def _get_client() -> "httpx.AsyncClient":
+    """Return the shared AsyncClient, creating it lazily (or after a close)."""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=httpx.Timeout(30.0),
+        )
+    return _CLIENT
+
+
+async def close_client() -> None:
+    """Close the shared AsyncClient; called from the app shutdown hook."""
+    global _CLIENT
+    if _CLIENT is not None and not _CLIENT.is_closed:
+        await _CLIENT.aclose()
+    _CLIENT = None
+
+
+def _json_body(payload: Any) -> Dict[str, Any]:
+    """httpx.post kwargs for a JSON body, pre-encoded to bytes with orjson when available."""
+    if orjson is None:
+        return {"json": payload}
+    return {"content": orjson.dumps(payload), "headers": {"content-type": "application/json"}}
+
+
+def _json_text(payload: Any) -> str:
+    """JSON-encode a payload to str (e.g. a form field), using orjson when available."""
+    if orjson is None:
+        return json.dumps(payload)
+    return orjson.dumps(payload).decode()
+
+
+def _parse_json(resp: "httpx.Response") -> Any:
+    """Decode a JSON response body, using orjson when available."""
+    if orjson is None:
+        return resp.json()
+    return orjson.loads(resp.content)
+
+
+def _decode_uploads(file_uploads: List[Dict[str, Any]]) -> List[Tuple[str, Tuple[str, bytes, str]]]:
+    """Decode base64 uploads once into httpx multipart parts."""
+    parts: List[Tuple[str, Tuple[str, bytes, str]]] = []
+    for f in file_uploads:
+        if not f.get("base64_data"):
+            continue
+        raw = base64.b64decode(f["base64_data"], validate=True)
+        parts.append((
+            "file",
+            (
+                f.get("filename", "uploaded_file"),
+                raw,
+                f.get("mime_type", "application/octet-stream"),
+            ),
+        ))
+    return parts
+
+
+def _error_response(request_id: str, agent_name: str, error_type: str, message: str) -> AgentResponse:
+    return AgentResponse(
+        request_id=request_id,
+        agent_name=agent_name,
+        status="error",
+        error=ErrorModel(type=error_type, message=message),
+    )
+
+
+def _upload_too_large(
+    request_id: str, agent_meta: AgentMetadata, file_uploads: List[Dict[str, Any]]
+) -> Optional[AgentResponse]:
+    """
+    payload_too_large error if any upload exceeds the base64 limit. The server
+    path already drops such files in normalize_file_uploads; this guards other
+    callers before a request body several times the file size is built.
+    """
+    max_b64 = file_utils.MAX_FILE_SIZE_BASE64
+    for f in file_uploads:
+        if len(f.get("base64_data") or "") > max_b64:
+            return _error_response(
+                request_id,
+                agent_meta.name,
+                "payload_too_large",
+                f"File {f.get('filename', 'uploaded_file')} exceeds the "
+                f"{max_b64} character base64 upload limit",
+            )
+    return None
+
+
+def _handle_handshake_response(
+    request_id: str, agent_meta: AgentMetadata, resp: "httpx.Response"
+) -> AgentResponse:
+    """Workers speaking the handshake contract return an AgentResponse body as-is."""
+    return AgentResponse(**_parse_json(resp))
+
+
+# (key, formatter) pairs rendered, in order, when the budget tracker omits "response".
+_BUDGET_FIELDS: Tuple[Tuple[str, Callable[[Any], str]], ...] = (
+    ("remaining", lambda v: f"Remaining: ${v:.2f}"),
+    ("project_name", lambda v: f"Project: {v}"),
+    ("overshoot_risk", lambda v: f"Overshoot Risk: {v}"),
+)
+
+
+def _format_budget_result(resp_data: Dict[str, Any]) -> str:
+    """Prefer the agent's own text; otherwise format the key data into a readable string."""
+    result_text = resp_data.get("response")
+    if result_text:
+        return result_text
+    parts = [fmt(resp_data[key]) for key, fmt in _BUDGET_FIELDS if key in resp_data]
+    if resp_data.get("recommendations"):
+        parts.append(f"Recommendations: {', '.join(resp_data['recommendations'])}")
+    return ". ".join(parts) if parts else str(resp_data)
+
+
+def _handle_budget_response(
+    request_id: str, agent_meta: AgentMetadata, resp: "httpx.Response"
+) -> AgentResponse:
+    """
+    Convert budget_tracker_agent's {success, response, ...} reply to the handshake
+    format. The parsed payload goes in details as-is; combine/answer prompts read it.
+    """
+    try:
+        resp_data = _parse_json(resp)
+        if not resp_data.get("success", False):
+            error_msg = resp_data.get("error", resp_data.get("message", "Unknown error from budget tracker agent"))
+            return _error_response(request_id, agent_meta.name, "agent_error", str(error_msg))
+        result_text = _format_budget_result(resp_data)
+    except Exception as parse_exc:
+        logger.error(f"Failed to parse budget_tracker_agent response: {parse_exc}, raw: {resp.text[:500]}")
+        return _error_response(
+            request_id, agent_meta.name, "parse_error", f"Failed to parse agent response: {str(parse_exc)}"
+        )
+
+    return AgentResponse(
+        request_id=request_id,
+        agent_name=agent_meta.name,
+        status="success",
+        output=OutputModel(result=result_text, details=resp_data or None),
+        error=None,
+    )
+
+
+# Agents whose replies are not handshake AgentResponses; all others use
+# _handle_handshake_response.
+# Read-only so nothing can register handlers at runtime; .get is bound once.
+_RESPONSE_HANDLERS: Mapping[str, Callable[[str, AgentMetadata, "httpx.Response"], AgentResponse]] = MappingProxyType({
+    "budget_tracker_agent": _handle_budget_response,
+})
+_get_response_handler = _RESPONSE_HANDLERS.get
+
 
 async def call_agent(
     agent_meta: AgentMetadata,
@@ -35,13 +234,35 @@ async def call_agent(
                      If provided, it replaces the entire input payload.
     """
 
-    request_id = str(uuid.uuid4())
+    request_id = uuid.uuid4().hex
     
     # Build metadata with file uploads if available
     metadata: Dict[str, Any] = {"language": "en", "extra": {}}
     file_uploads = context.get("file_uploads", [])
-    
-    if file_uploads and len(file_uploads) > 0:
+    multipart_files: List[Tuple[str, Tuple[str, bytes, str]]] = []
+
+    if agent_meta.name == "budget_tracker_agent":
+        # Only {"query": text} is sent to this agent, so uploads never reach it.
+        file_uploads = []
+
+    use_multipart = agent_meta.accepts_multipart and any(
+        len(f.get("base64_data") or "") * 3 // 4 > MULTIPART_MIN_BYTES for f in file_uploads or []
+    )
+    if file_uploads and use_multipart:
+        # Agent accepts raw bytes: send files as multipart parts and keep the
+        # base64 strings out of the JSON handshake entirely.
+        too_large = _upload_too_large(request_id, agent_meta, file_uploads)
+        if too_large is not None:
+            return too_large
+        try:
+            multipart_files = _decode_uploads(file_uploads)
+        except (binascii.Error, ValueError) as exc:
+            return _error_response(request_id, agent_meta.name, "invalid_file", f"Could not decode uploaded file: {exc}")
+        logger.info("Sending %d file(s) to %s as multipart", len(multipart_files), agent_meta.name)
+    elif file_uploads and len(file_uploads) > 0:
+        too_large = _upload_too_large(request_id, agent_meta, file_uploads)
+        if too_large is not None:
+            return too_large
         # For document summarizer agent, send first file as base64 in metadata
         # Note: Currently supports single file; can be extended for multiple files
         first_file = file_uploads[0]
@@ -51,14 +272,15 @@ async def call_agent(
             metadata["mime_type"] = first_file.get("mime_type", "application/octet-stream")
             metadata["filename"] = first_file.get("filename", "uploaded_file")
             
-            # Debug logging
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"Sending file to {agent_meta.name}: {first_file.get('filename', 'unknown')} ({len(base64_data)} chars base64)")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Sending file to %s: %s (%d chars base64)",
+                    agent_meta.name,
+                    first_file.get("filename", "unknown"),
+                    len(base64_data),
+                )
         else:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"File upload found but base64_data is empty for {agent_meta.name}")
+            logger.warning("File upload found but base64_data is empty for %s", agent_meta.name)
             
         # Add support for multiple files in metadata
         metadata["files"] = []
@@ -70,129 +292,98 @@ async def call_agent(
                      "filename": f.get("filename", "uploaded_file")
                  })
     else:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.debug(f"No file uploads in context for {agent_meta.name}")
+        logger.debug("No file uploads in context for %s", agent_meta.name)
     
     handshake = AgentRequest(
         request_id=request_id,
         agent_name=agent_meta.name,
         intent=intent,
         input={"text": text, "metadata": metadata},
-        context=context,
+        context=(
+            {k: v for k, v in context.items() if k != "file_uploads"}
+            if multipart_files
+            else context
+        ),
     )
 
     # Only live HTTP calls are supported; no simulation fallback.
     if agent_meta.type == "http" and agent_meta.endpoint and httpx is not None:
+        if _breaker_open(agent_meta.name):
+            return _error_response(
+                request_id,
+                agent_meta.name,
+                "circuit_open",
+                f"{agent_meta.name} is failing repeatedly; skipping calls for up to {_BREAKER_COOLDOWN_S:.0f}s",
+            )
         try:
-            import logging
-            logger = logging.getLogger(__name__)
-            
-            async with httpx.AsyncClient(timeout=agent_meta.timeout_ms / 1000) as client:
-                # Special handling for budget_tracker_agent - it expects {"query": "..."} format
-                if agent_meta.name == "budget_tracker_agent":
-                    payload = {"query": text}
+            client = _get_client()
+            # Special handling for budget_tracker_agent - it expects {"query": "..."} format
+            if agent_meta.name == "budget_tracker_agent":
+                payload = {"query": text}
+                if logger.isEnabledFor(logging.INFO):
                     logger.info(f"Calling {agent_meta.name} with payload: {payload}")
-                else:
-                    payload = handshake.dict()
-                
-                resp = await client.post(agent_meta.endpoint, json=payload)
-                logger.info(f"{agent_meta.name} response status: {resp.status_code}")
-                if resp.status_code != 200:
-                    return AgentResponse(
-                        request_id=request_id,
-                        agent_name=agent_meta.name,
-                        status="error",
-                        error=ErrorModel(
-                            type="http_error",
-                            message=f"HTTP {resp.status_code} calling {agent_meta.endpoint}",
-                        ),
-                    )
-                
-                # Special handling for budget_tracker_agent response format
-                if agent_meta.name == "budget_tracker_agent":
-                    try:
-                        resp_data = resp.json()
-                        # Convert budget tracker response to supervisor handshake format
-                        if resp_data.get("success", False):
-                            # Extract the response text or format the data
-                            result_text = resp_data.get("response")
-                            if not result_text:
-                                # If no "response" field, format the key data into a readable string
-                                parts = []
-                                if "remaining" in resp_data:
-                                    parts.append(f"Remaining: ${resp_data['remaining']:.2f}")
-                                if "project_name" in resp_data:
-                                    parts.append(f"Project: {resp_data['project_name']}")
-                                if "overshoot_risk" in resp_data:
-                                    parts.append(f"Overshoot Risk: {resp_data['overshoot_risk']}")
-                                if "recommendations" in resp_data and resp_data["recommendations"]:
-                                    parts.append(f"Recommendations: {', '.join(resp_data['recommendations'])}")
-                                result_text = ". ".join(parts) if parts else str(resp_data)
-                            
-                            return AgentResponse(
-                                request_id=request_id,
-                                agent_name=agent_meta.name,
-                                status="success",
-                                output=OutputModel(
-                                    result=result_text,
-                                    details=json.dumps(resp_data, indent=2) if resp_data else None,
-                                ),
-                                error=None,
-                            )
-                        else:
-                            # Budget tracker returned success=false or error
-                            error_msg = resp_data.get("error", resp_data.get("message", "Unknown error from budget tracker agent"))
-                            return AgentResponse(
-                                request_id=request_id,
-                                agent_name=agent_meta.name,
-                                status="error",
-                                error=ErrorModel(
-                                    type="agent_error",
-                                    message=str(error_msg),
-                                ),
-                            )
-                    except Exception as parse_exc:
-                        # If JSON parsing fails, try to return the raw response
-                        import logging
-                        logger = logging.getLogger(__name__)
-                        logger.error(f"Failed to parse budget_tracker_agent response: {parse_exc}, raw: {resp.text[:500]}")
-                        return AgentResponse(
-                            request_id=request_id,
-                            agent_name=agent_meta.name,
-                            status="error",
-                            error=ErrorModel(
-                                type="parse_error",
-                                message=f"Failed to parse agent response: {str(parse_exc)}",
-                            ),
-                        )
-                else:
-                    return AgentResponse(**resp.json())
+                body = _json_body(payload)
+            elif multipart_files:
+                # Handshake travels as a JSON form field alongside the raw file parts.
+                body = {
+                    "data": {"request": _json_text(handshake.dict())},
+                    "files": multipart_files,
+                }
+            else:
+                body = _json_body(handshake.dict())
+            
+            resp = await client.post(
+                agent_meta.endpoint,
+                timeout=agent_meta.timeout_ms / 1000,
+                **body,
+            )
         except Exception as exc:
-            return AgentResponse(
-                request_id=request_id,
-                agent_name=agent_meta.name,
-                status="error",
-                error=ErrorModel(type="network_error", message=str(exc)),
+            _record_failure(agent_meta.name)
+            return _error_response(request_id, agent_meta.name, "network_error", str(exc))
+
+        # The breaker tracks transport health only; a bad body from a healthy
+        # agent is reported below without counting against it.
+        logger.info("%s response status: %s", agent_meta.name, resp.status_code)
+        if resp.status_code >= 500:
+            _record_failure(agent_meta.name)
+        else:
+            _record_success(agent_meta.name)
+        if resp.status_code != 200:
+            return _error_response(
+                request_id,
+                agent_meta.name,
+                "http_error",
+                f"HTTP {resp.status_code} calling {agent_meta.endpoint}",
             )
+
+        handler = _get_response_handler(agent_meta.name, _handle_handshake_response)
+        try:
+            return handler(request_id, agent_meta, resp)
+        except Exception as exc:
+            logger.error("Invalid response from %s: %s", agent_meta.name, exc)
+            return _error_response(request_id, agent_meta.name, "parse_error", str(exc))
     elif agent_meta.type == "http" and httpx is None:
-        return AgentResponse(
-            request_id=request_id,
-            agent_name=agent_meta.name,
-            status="error",
-            error=ErrorModel(type="config_error", message="httpx not installed for HTTP agent calls"),
-        )
+        return _error_response(request_id, agent_meta.name, "config_error", "httpx not installed for HTTP agent calls")
     elif agent_meta.type == "cli":
-        return AgentResponse(
-            request_id=request_id,
-            agent_name=agent_meta.name,
-            status="error",
-            error=ErrorModel(type="not_implemented", message="CLI agent execution is not implemented"),
-        )
+        return _error_response(request_id, agent_meta.name, "not_implemented", "CLI agent execution is not implemented")
     else:
-        return AgentResponse(
-            request_id=request_id,
-            agent_name=agent_meta.name,
-            status="error",
-            error=ErrorModel(type="config_error", message="Agent endpoint/command not configured"),
-        )
+        return _error_response(request_id, agent_meta.name, "config_error", "Agent endpoint/command not configured")
+
+
+async def call_agents_batch(
+    reqs: Sequence[Tuple[AgentMetadata, str, str, Dict[str, Any]]],
+    max_concurrency: int = 8,
+) -> List[AgentResponse]:
+    """
+    Call several independent agents concurrently, at most `max_concurrency` at a
+    time. Each request is (agent_meta, intent, text, context); responses come
+    back in request order. Callers must only batch steps that do not depend on
+    each other's output.
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _one(req: Tuple[AgentMetadata, str, str, Dict[str, Any]]) -> AgentResponse:
+        async with sem:
+            return await call_agent(*req)
+
+    return list(await asyncio.gather(*(_one(r) for r in reqs)))
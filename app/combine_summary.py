@@ -0,0 +1,99 @@
+"""
+Fused combine + history summary. A multi-agent turn needs a combined answer
+now and a history summary on the next request; asking for both in one JSON
+response saves the second OpenRouter round-trip.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, List, Set
+import logging
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+try:
+    from openai import BadRequestError  # type: ignore
+except ImportError:
+    BadRequestError = None
+
+from ._llm_client import dumps_prompt, get_openrouter_client
+from .combine import COMBINE_SYSTEM_PROMPT, combine_tool_outputs
+from .history import SUMMARY_SYSTEM_PROMPT
+from .models import CombinedAnswerRequest, CombinedAnswerResponse
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "google/gemini-2.5-flash-lite")
+
+# Models that rejected response_format=json_object. Once a model is here we go
+# straight to combine_tool_outputs instead of paying for a failed call per turn.
+_JSON_MODE_UNSUPPORTED: Set[str] = set()
+
+FUSED_SYSTEM_PROMPT = (
+    f"{COMBINE_SYSTEM_PROMPT}\n\n"
+    "Also write a conversation summary covering the recent turns plus this user query "
+    f"and your combined answer. {SUMMARY_SYSTEM_PROMPT}\n\n"
+    'Respond with a JSON object: {"combined": "<answer>", "summary": "<summary>"}.'
+)
+
+
+def _rejects_json_mode(exc: Exception) -> bool:
+    """True only for a 400 about response_format, not e.g. a context-length error."""
+    if BadRequestError is None or not isinstance(exc, BadRequestError):
+        return False
+    return getattr(exc, "param", None) == "response_format" or "response_format" in str(exc)
+
+
+def combine_with_summary(req: CombinedAnswerRequest, history: List[Dict[str, str]]) -> CombinedAnswerResponse:
+    """
+    Combine tool outputs and summarize the conversation (prior turns plus this
+    exchange) in a single LLM call. The summary is returned in
+    `history_summary`; it is None whenever we fall back to plain combine.
+    """
+    client = get_openrouter_client()
+    if client is None or OPENROUTER_MODEL in _JSON_MODE_UNSUPPORTED:
+        return combine_tool_outputs(req)
+
+    user_payload = {
+        "user_query": req.user_query,
+        "tool_outputs": req.tool_outputs,
+        # The next request summarizes its last 6 turns: these 4 plus this exchange.
+        "recent_turns": history[-4:],
+    }
+    if req.history_summary:
+        user_payload["history_summary"] = req.history_summary
+
+    try:
+        response = client.chat.completions.create(
+            model=OPENROUTER_MODEL,
+            messages=[
+                {"role": "system", "content": FUSED_SYSTEM_PROMPT},
+                {"role": "user", "content": dumps_prompt(user_payload)},
+            ],
+            response_format={"type": "json_object"},
+        )
+    except Exception as exc:
+        if _rejects_json_mode(exc):
+            # The model rejected json_object; don't try the fused call again.
+            _JSON_MODE_UNSUPPORTED.add(OPENROUTER_MODEL)
+            logger.warning("%s rejected the fused combine/summary call, disabling it: %s", OPENROUTER_MODEL, exc)
+        else:
+            logger.warning("Fused combine/summary call failed, falling back: %s", exc)
+        return combine_tool_outputs(req)
+
+    try:
+        content = response.choices[0].message.content
+        data = orjson.loads(content) if orjson is not None else json.loads(content)
+        combined = str(data["combined"]).strip()
+        summary = str(data.get("summary") or "").strip()
+    except Exception as exc:
+        logger.error("Fused combine/summary returned unusable JSON: %s", exc)
+        return combine_tool_outputs(req)
+
+    if not combined:
+        return combine_tool_outputs(req)
+    return CombinedAnswerResponse(combined_answer=combined, history_summary=summary or None)
@@ -5,16 +5,17 @@ outputs for later synthesis or UI debugging.
 from __future__ import annotations
 
 import uuid
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 try:
     import httpx  # type: ignore
 except ImportError:
     httpx = None
 
-from .agent_caller import call_agent
+from .agent_caller import call_agent, call_agents_batch
 from .combine import combine_tool_outputs
-from .models import AgentMetadata, AgentRequest, AgentResponse, CombinedAnswerRequest, CombinedAnswerResponse, ErrorModel, Plan, UsedAgentEntry
+from .combine_summary import combine_with_summary
+from .models import AgentMetadata, AgentRequest, AgentResponse, CombinedAnswerRequest, CombinedAnswerResponse, ErrorModel, Plan, PlanStep, UsedAgentEntry
 from .registry import find_agent_by_name
 
 
@@ -36,59 +37,132 @@ def resolve_input(input_source: str, user_query: str, step_outputs: Dict[int, Ag
     return user_query
 
 
+# Intents known to only read worker state. Consecutive steps with these intents
+# may run concurrently; any other intent (including ones added to the registry
+# later) runs in a wave of its own, matching the old sequential behaviour.
+# budget_tracker_agent is absent on purpose: it only receives the query text, so
+# its intent says nothing about whether the call updates a budget.
+READ_ONLY_INTENTS = frozenset({
+    "email.priority.classify",
+    "summary.create", "summarize_document", "summarize_text",
+    "extract_key_points", "identify_risks", "extract_action_items",
+    "meeting.analyze", "action_items.extract",
+    "onboarding.check_progress", "employee.check_status",
+    "goal.list", "reminders.get", "productivity.report", "productivity.analyze",
+    "productivity.accountability", "productivity.insights",
+    "calendar.list_meetings", "calendar.check_conflicts",
+    "focus.check_status",
+    "document.review", "document.review.spelling", "document.review.grammar",
+    "document.review.compliance",
+})
 
 
+def step_dependency(step: PlanStep, step_ids: Set[int]) -> Optional[int]:
+    """Return the plan step whose output this step reads, if any."""
+    if not step.input_source.startswith("step:"):
+        return None
+    try:
+        dep = int(step.input_source.split(":")[1].split(".")[0])
+    except (IndexError, ValueError):
+        return None
+    return dep if dep in step_ids and dep != step.step_id else None
+
+
+def next_wave(pending: List[PlanStep], done: Set[int], step_ids: Set[int]) -> List[PlanStep]:
+    """
+    Longest prefix of pending steps whose inputs are already available. Taking a
+    prefix (rather than every ready step) keeps outputs in plan order. Only
+    READ_ONLY_INTENTS steps share a wave; any other step runs on its own.
+    """
+    wave: List[PlanStep] = []
+    for step in pending:
+        dep = step_dependency(step, step_ids)
+        if dep is not None and dep not in done:
+            break
+        if step.intent not in READ_ONLY_INTENTS:
+            if not wave:
+                wave.append(step)
+            break
+        wave.append(step)
+    # A step waiting on a later/unknown step still runs; resolve_input falls back.
+    return wave or pending[:1]
+
+
+async def _auto_trigger_tda(
+    step: PlanStep,
+    response: AgentResponse,
+    registry: List[AgentMetadata],
+    context: Dict[str, Any],
+    step_outputs: Dict[int, AgentResponse],
+    used_agents: List[UsedAgentEntry],
+) -> None:
+    """Auto-trigger TDA after KnowledgeBaseBuilderAgent successfully creates tasks."""
+    if (step.agent == "KnowledgeBaseBuilderAgent" and 
+        response.status == "success" and 
+        step.intent == "create_task"):
+        try:
+            tda_meta = find_agent_by_name("task_dependency_agent", registry)
+            # Call TDA with database trigger - it will retrieve tasks from MongoDB
+            tda_response = await call_agent(
+                tda_meta,
+                "task.resolve_dependencies",
+                "",  # Empty text since TDA uses trigger
+                context,
+                custom_input={"trigger": "database_update"}  # Signal to retrieve from DB
+            )
+            # Add TDA to outputs with next step_id
+            next_step_id = max(step_outputs.keys()) + 1 if step_outputs else 0
+            step_outputs[next_step_id] = tda_response
+            used_agents.append(
+                UsedAgentEntry(
+                    name=tda_meta.name,
+                    intent="task.resolve_dependencies",
+                    status=tda_response.status
+                )
+            )
+        except KeyError:
+            # TDA not found in registry, skip auto-trigger
+            pass
+        except Exception:
+            # TDA call failed, continue without blocking
+            pass
+
 
 async def execute_plan(
     query: str,
     plan: Plan,
     registry: List[AgentMetadata],
     context: Dict[str, Any],
+    history: Optional[List[Dict[str, str]]] = None,
 ) -> Tuple[Dict[int, AgentResponse], List[UsedAgentEntry], CombinedAnswerResponse]:
-    """Execute each planned step in order, then combine outputs when multiple agents are used."""
+    """
+    Execute planned steps in order, then combine outputs when multiple agents are used.
+    Consecutive read-only steps that do not read each other's output are called concurrently.
+    When `history` is given, the combine call also returns an updated conversation summary.
+    """
     step_outputs: Dict[int, AgentResponse] = {}
     used_agents: List[UsedAgentEntry] = []
 
-    for step in plan.steps:
-        agent_meta = find_agent_by_name(step.agent, registry)
-        text = resolve_input(step.input_source, query, step_outputs)
+    step_ids = {step.step_id for step in plan.steps}
+    pending = list(plan.steps)
+    while pending:
+        # Steps in a wave are read-only and independent, so call them concurrently.
+        wave = next_wave(pending, set(step_outputs), step_ids)
+        pending = pending[len(wave):]
+        metas = [find_agent_by_name(step.agent, registry) for step in wave]
         # Pass file uploads from context to agent caller
-        response = await call_agent(agent_meta, step.intent, text, context)
-        step_outputs[step.step_id] = response
-        used_agents.append(
-            UsedAgentEntry(name=agent_meta.name, intent=step.intent, status=response.status)
+        responses = await call_agents_batch(
+            [
+                (agent_meta, step.intent, resolve_input(step.input_source, query, step_outputs), context)
+                for agent_meta, step in zip(metas, wave)
+            ]
         )
-        
-        # Auto-trigger TDA after KnowledgeBaseBuilderAgent successfully creates tasks
-        if (step.agent == "KnowledgeBaseBuilderAgent" and 
-            response.status == "success" and 
-            step.intent == "create_task"):
-            try:
-                tda_meta = find_agent_by_name("task_dependency_agent", registry)
-                # Call TDA with database trigger - it will retrieve tasks from MongoDB
-                tda_response = await call_agent(
-                    tda_meta,
-                    "task.resolve_dependencies",
-                    "",  # Empty text since TDA uses trigger
-                    context,
-                    custom_input={"trigger": "database_update"}  # Signal to retrieve from DB
-                )
-                # Add TDA to outputs with next step_id
-                next_step_id = max(step_outputs.keys()) + 1 if step_outputs else 0
-                step_outputs[next_step_id] = tda_response
-                used_agents.append(
-                    UsedAgentEntry(
-                        name=tda_meta.name,
-                        intent="task.resolve_dependencies",
-                        status=tda_response.status
-                    )
-                )
-            except KeyError:
-                # TDA not found in registry, skip auto-trigger
-                pass
-            except Exception:
-                # TDA call failed, continue without blocking
-                pass
+        for agent_meta, step, response in zip(metas, wave, responses):
+            step_outputs[step.step_id] = response
+            used_agents.append(
+                UsedAgentEntry(name=agent_meta.name, intent=step.intent, status=response.status)
+            )
+            await _auto_trigger_tda(step, response, registry, context, step_outputs, used_agents)
 
     # Combine outputs when multiple distinct agents were used
     distinct_agents = {ua.name for ua in used_agents}
@@ -109,7 +183,10 @@ async def execute_plan(
             tool_outputs=tool_outputs,
             history_summary=context.get("history_summary"),
         )
-        combined = combine_tool_outputs(combine_req)
+        if history is not None:
+            combined = combine_with_summary(combine_req, history)
+        else:
+            combined = combine_tool_outputs(combine_req)
     else:
         combined = CombinedAnswerResponse(combined_answer="")
 
@@ -4,12 +4,14 @@ Centralizes file upload parsing and validation logic.
 """
 from __future__ import annotations
 
+import os
 import re
 from typing import Dict, List, Optional
 
 # Constants
 FILE_UPLOAD_MARKER_PATTERN = r'\[FILE_UPLOAD:(.+):([^:]+):([^\]]+)\]'
-MAX_FILE_SIZE_BASE64 = 25 * 1024 * 1024  # 25MB in base64 (roughly 18.75MB binary)
+# 25MB in base64 (roughly 18.75MB binary) unless overridden by env
+MAX_FILE_SIZE_BASE64 = int(os.getenv("MAX_FILE_SIZE_BASE64", 25 * 1024 * 1024))
 SUPPORTED_MIME_TYPES = {
     'text/plain',
     'text/markdown',
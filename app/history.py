@@ -4,66 +4,105 @@ to avoid passing full transcripts downstream.
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import os
-from typing import List, Dict
+from collections import OrderedDict
+from typing import Dict, List, Optional
 import logging
 
-try:
-    from openai import OpenAI  # type: ignore
-except ImportError:
-    OpenAI = None
+from ._llm_client import get_openrouter_client
 
 logger = logging.getLogger(__name__)
 
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "google/gemini-2.5-flash-lite")
 
+SUMMARY_SYSTEM_PROMPT = (
+    "Summarize the conversation so far in 2-3 concise sentences. "
+    "Capture user goals, key details, and any decisions or constraints. "
+    "Do not invent new facts."
+)
+
+# Below this many characters across the recent turns, the turns are passed
+# through verbatim; an LLM summary would cost a round-trip and save little.
+SHORT_HISTORY_CHARS = 1200
+
+# LRU of LLM summaries keyed by a hash of the recent-turn window. Clients often
+# re-send the same window, so repeats skip the OpenRouter round-trip entirely.
+_SUMMARY_CACHE_MAX = 256
+_SUMMARY_CACHE: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _join_turns(window: List[Dict[str, str]]) -> str:
+    return " | ".join(f"{m.get('role')}: {m.get('content', '')}" for m in window)
+
+
+def _history_key(window: List[Dict[str, str]]) -> str:
+    encoded = json.dumps(window, sort_keys=True).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[str]:
+    summary = _SUMMARY_CACHE.get(key)
+    if summary is not None:
+        _SUMMARY_CACHE.move_to_end(key)
+    return summary
+
+
+def _cache_put(key: str, summary: str) -> None:
+    _SUMMARY_CACHE[key] = summary
+    _SUMMARY_CACHE.move_to_end(key)
+    if len(_SUMMARY_CACHE) > _SUMMARY_CACHE_MAX:
+        _SUMMARY_CACHE.popitem(last=False)
+
+
+def prime_summary(history: List[Dict[str, str]], summary: str) -> None:
+    """Seed the cache with a summary produced elsewhere (e.g. the fused combine call)."""
+    if history and summary:
+        _cache_put(_history_key(history[-6:]), summary)
+
 
 def summarize_history(history: List[Dict[str, str]]) -> str:
     """
-    Summarize recent conversation turns into a short context string. Uses
-    OpenRouter if available; otherwise falls back to a simple concatenation.
+    Summarize recent conversation turns into a short context string. Short
+    histories are returned verbatim; longer ones use OpenRouter if available,
+    otherwise a truncated concatenation.
     """
     if not history:
         return ""
 
+    window = history[-6:]
+    if sum(len(m.get("content", "")) for m in window) < SHORT_HISTORY_CHARS:
+        return f"Recent conversation: {_join_turns(window)}"
+
     # Fallback summary if LLM is unavailable
     def _fallback() -> str:
         # Keep it compact: role: content truncated
-        parts = [f"{m.get('role')}: {m.get('content', '')}" for m in history[-6:]]
-        joined = " | ".join(parts)
-        return f"Conversation summary (fallback): {joined[:500]}"
+        return f"Conversation summary (fallback): {_join_turns(window)[:500]}"
 
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    if OpenAI is None or not api_key:
+    client = get_openrouter_client()
+    if client is None:
         return _fallback()
 
-    try:
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-        )
-    except Exception as exc:
-        logger.error("Failed to init OpenRouter client for history summary: %s", exc)
-        return _fallback()
+    cache_key = _history_key(window)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
 
-    system_prompt = (
-        "Summarize the conversation so far in 2-3 concise sentences. "
-        "Capture user goals, key details, and any decisions or constraints. "
-        "Do not invent new facts."
-    )
-    user_prompt = json.dumps({"history": history[-6:]}, indent=2)
+    user_prompt = json.dumps({"history": window}, indent=2)
 
     try:
         response = client.chat.completions.create(
             model=OPENROUTER_MODEL,
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ],
         )
         if response.choices:
-            return response.choices[0].message.content.strip()
+            summary = response.choices[0].message.content.strip()
+            _cache_put(cache_key, summary)
+            return summary
     except Exception as exc:
         logger.error("History summarization failed: %s", exc)
         return _fallback()
@@ -91,6 +91,9 @@ class AgentMetadata(BaseModel):
     command: Optional[str] = None
     healthcheck: Optional[str] = None
     timeout_ms: int = 5000
+    # When True, file uploads are sent as multipart/form-data parts instead of
+    # base64 strings embedded in the JSON handshake.
+    accepts_multipart: bool = False
 
 
 class PlanStep(BaseModel):
@@ -123,3 +126,5 @@ class CombinedAnswerResponse(BaseModel):
     """LLM combine output with a fallback summary."""
 
     combined_answer: str
+    # Conversation summary including this exchange, when produced by the fused call.
+    history_summary: Optional[str] = None
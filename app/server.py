@@ -18,9 +18,10 @@ try:
 except ImportError:
     httpx = None
 
+from .agent_caller import close_client
 from .answer import compose_final_answer
 from .conversation import append_turn, get_history
-from .history import summarize_history
+from .history import prime_summary, summarize_history
 from .executor import execute_plan
 from .general import handle_general_query
 from .file_utils import normalize_file_uploads
@@ -37,6 +38,10 @@ def build_app() -> FastAPI:
         logging.basicConfig(level=logging.INFO)
     app = FastAPI(title="Supervisor Agent Demo")
 
+    @app.on_event("shutdown")
+    async def shutdown_agent_client():
+        await close_client()
+
     @app.get("/")
     async def home():
         return render_home()
@@ -140,7 +145,9 @@ def build_app() -> FastAPI:
             (history_summary[:160] + "...") if history_summary and len(history_summary) > 160 else history_summary,
         )
 
-        step_outputs, used_agents, combined = await execute_plan(query_text, plan, registry, context)
+        step_outputs, used_agents, combined = await execute_plan(
+            query_text, plan, registry, context, history=history
+        )
         # Post-process task dependency output to produce user-friendly names instead of raw JSON.
         async def summarize_dependencies(step_outputs_map: Dict[int, AgentResponse]) -> None:
             dep_responses = [
@@ -216,6 +223,17 @@ def build_app() -> FastAPI:
         # If multiple agents used, prefer combined answer; otherwise use standard synthesis.
         if combined and combined.combined_answer:
             answer = combined.combined_answer
+            if combined.history_summary:
+                # The fused combine call already summarized this exchange; seed the
+                # cache so the next request's summarize_history skips its LLM call.
+                prime_summary(
+                    history
+                    + [
+                        {"role": "user", "content": payload.query},
+                        {"role": "assistant", "content": answer},
+                    ],
+                    combined.history_summary,
+                )
         else:
             answer = compose_final_answer(payload.query, step_outputs, history=history_summary)
 
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import time
+
+from app import agent_caller
+from app.models import AgentMetadata
+
+
+class FailingClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def post(self, *args, **kwargs):
+        self.calls += 1
+        raise RuntimeError("connect timeout")
+
+
+def test_circuit_opens_after_repeated_failures(monkeypatch):
+    client = FailingClient()
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: client)
+    monkeypatch.setattr(agent_caller, "_BREAKER", {})
+    meta = AgentMetadata(
+        name="flaky_agent",
+        description="test agent",
+        intents=["test.run"],
+        type="http",
+        endpoint="http://flaky.invalid/handle",
+    )
+
+    for _ in range(agent_caller._BREAKER_THRESHOLD):
+        resp = asyncio.run(agent_caller.call_agent(meta, "test.run", "hi", {}))
+        assert resp.status == "error"
+        assert resp.error.type == "network_error"
+
+    resp = asyncio.run(agent_caller.call_agent(meta, "test.run", "hi", {}))
+    assert resp.error.type == "circuit_open"
+    assert client.calls == agent_caller._BREAKER_THRESHOLD
+
+
+def _budget_client(payload):
+    class BudgetResp:
+        status_code = 200
+        text = "{}"
+
+        def json(self):
+            return payload
+
+        @property
+        def content(self):
+            return json.dumps(payload).encode()
+
+    class Client:
+        async def post(self, *args, **kwargs):
+            return BudgetResp()
+
+    return Client()
+
+
+def test_budget_details_keep_parsed_payload(monkeypatch):
+    payload = {"success": True, "remaining": 10.0, "spent": 90.0}
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: _budget_client(payload))
+    monkeypatch.setattr(agent_caller, "_BREAKER", {})
+    meta = AgentMetadata(
+        name="budget_tracker_agent",
+        description="test agent",
+        intents=["budget.check"],
+        type="http",
+        endpoint="http://budget.invalid/query",
+    )
+
+    resp = asyncio.run(agent_caller.call_agent(meta, "budget.check", "how much left", {}))
+    assert resp.output.details == payload
+
+
+def test_oversized_upload_rejected(monkeypatch):
+    client = FailingClient()
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: client)
+    monkeypatch.setattr(agent_caller.file_utils, "MAX_FILE_SIZE_BASE64", 8)
+    meta = AgentMetadata(
+        name="document_summarizer_agent",
+        description="test agent",
+        intents=["summarize_document"],
+        type="http",
+        endpoint="http://summarizer.invalid/execute",
+    )
+    uploads = [{"base64_data": "aGVsbG8gd29ybGQ=", "filename": "big.txt", "mime_type": "text/plain"}]
+
+    resp = asyncio.run(agent_caller.call_agent(meta, "summarize_document", "summarize", {"file_uploads": uploads}))
+    assert resp.status == "error"
+    assert resp.error.type == "payload_too_large"
+    assert client.calls == 0
+
+
+def test_oversized_upload_ignored_by_query_only_agent(monkeypatch):
+    payload = {"success": True, "response": "Budget is fine"}
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: _budget_client(payload))
+    monkeypatch.setattr(agent_caller, "_BREAKER", {})
+    monkeypatch.setattr(agent_caller.file_utils, "MAX_FILE_SIZE_BASE64", 8)
+    meta = AgentMetadata(
+        name="budget_tracker_agent",
+        description="test agent",
+        intents=["budget.check"],
+        type="http",
+        endpoint="http://budget.invalid/query",
+    )
+    uploads = [{"base64_data": "aGVsbG8gd29ybGQ=", "filename": "big.txt", "mime_type": "text/plain"}]
+
+    resp = asyncio.run(agent_caller.call_agent(meta, "budget.check", "how much left", {"file_uploads": uploads}))
+    assert resp.status == "success"
+    assert resp.output.result == "Budget is fine"
+
+
+class RecordingClient:
+    def __init__(self):
+        self.kwargs = None
+
+    async def post(self, *args, **kwargs):
+        self.kwargs = kwargs
+
+        class Resp:
+            status_code = 200
+            text = "{}"
+            content = b'{"request_id": "r", "agent_name": "doc_agent", "status": "success"}'
+
+            def json(self):
+                return json.loads(self.content)
+
+        return Resp()
+
+
+def _multipart_meta():
+    return AgentMetadata(
+        name="doc_agent",
+        description="test agent",
+        intents=["summarize_document"],
+        type="http",
+        endpoint="http://doc.invalid/execute",
+        accepts_multipart=True,
+    )
+
+
+def test_large_upload_sent_as_multipart(monkeypatch):
+    client = RecordingClient()
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: client)
+    monkeypatch.setattr(agent_caller, "_BREAKER", {})
+    monkeypatch.setattr(agent_caller, "MULTIPART_MIN_BYTES", 4)
+    uploads = [{"base64_data": "aGVsbG8gd29ybGQ=", "filename": "a.txt", "mime_type": "text/plain"}]
+    context = {"file_uploads": uploads, "user_id": "u1"}
+
+    resp = asyncio.run(agent_caller.call_agent(_multipart_meta(), "summarize_document", "summarize", context))
+
+    assert resp.status == "success"
+    assert client.kwargs["files"] == [("file", ("a.txt", b"hello world", "text/plain"))]
+    assert "content" not in client.kwargs and "json" not in client.kwargs
+    request = json.loads(client.kwargs["data"]["request"])
+    assert request["context"] == {"user_id": "u1"}
+    assert "file_base64" not in request["input"]["metadata"]
+
+
+def test_small_upload_stays_in_json_handshake(monkeypatch):
+    client = RecordingClient()
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: client)
+    monkeypatch.setattr(agent_caller, "_BREAKER", {})
+    uploads = [{"base64_data": "aGVsbG8gd29ybGQ=", "filename": "a.txt", "mime_type": "text/plain"}]
+
+    asyncio.run(agent_caller.call_agent(_multipart_meta(), "summarize_document", "summarize", {"file_uploads": uploads}))
+
+    assert "files" not in client.kwargs
+    body = client.kwargs["content"] if "content" in client.kwargs else json.dumps(client.kwargs["json"])
+    assert json.loads(body)["input"]["metadata"]["file_base64"] == "aGVsbG8gd29ybGQ="
+
+
+class ScriptedClient:
+    """Returns each scripted status code in turn; None raises a transport error."""
+
+    def __init__(self, statuses, content=b'{"request_id": "r", "agent_name": "flaky_agent", "status": "success"}'):
+        self.statuses = list(statuses)
+        self.content = content
+        self.calls = 0
+
+    async def post(self, *args, **kwargs):
+        self.calls += 1
+        status = self.statuses.pop(0)
+        if status is None:
+            raise RuntimeError("connect timeout")
+
+        class Resp:
+            status_code = status
+            text = ""
+            content = self.content
+
+        return Resp()
+
+
+def _flaky_meta():
+    return AgentMetadata(
+        name="flaky_agent",
+        description="test agent",
+        intents=["test.run"],
+        type="http",
+        endpoint="http://flaky.invalid/handle",
+    )
+
+
+def _call(meta):
+    return asyncio.run(agent_caller.call_agent(meta, "test.run", "hi", {}))
+
+
+def test_trial_call_after_cooldown_closes_breaker(monkeypatch):
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: ScriptedClient([200]))
+    expired = time.monotonic() - 1
+    monkeypatch.setattr(agent_caller, "_BREAKER", {"flaky_agent": (agent_caller._BREAKER_THRESHOLD, expired)})
+
+    assert _call(_flaky_meta()).status == "success"
+    assert "flaky_agent" not in agent_caller._BREAKER
+
+
+def test_failed_trial_call_reopens_breaker(monkeypatch):
+    client = ScriptedClient([None, 200])
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: client)
+    expired = time.monotonic() - 1
+    monkeypatch.setattr(agent_caller, "_BREAKER", {"flaky_agent": (agent_caller._BREAKER_THRESHOLD, expired)})
+
+    assert _call(_flaky_meta()).error.type == "network_error"
+    assert _call(_flaky_meta()).error.type == "circuit_open"
+    assert client.calls == 1
+
+
+def test_success_resets_failure_count(monkeypatch):
+    threshold = agent_caller._BREAKER_THRESHOLD
+    client = ScriptedClient([None] * (threshold - 1) + [200] + [503] * (threshold - 1))
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: client)
+    monkeypatch.setattr(agent_caller, "_BREAKER", {})
+
+    for _ in range(2 * threshold - 1):
+        _call(_flaky_meta())
+
+    assert agent_caller._BREAKER["flaky_agent"][0] == threshold - 1
+
+
+def test_unparseable_body_does_not_trip_breaker(monkeypatch):
+    client = ScriptedClient([200] * 6, content=b"not json")
+    monkeypatch.setattr(agent_caller, "_get_client", lambda: client)
+    monkeypatch.setattr(agent_caller, "_BREAKER", {})
+
+    for _ in range(agent_caller._BREAKER_THRESHOLD + 1):
+        assert _call(_flaky_meta()).error.type == "parse_error"
+    assert client.calls == agent_caller._BREAKER_THRESHOLD + 1
+    assert "flaky_agent" not in agent_caller._BREAKER
@@ -0,0 +1,113 @@
+from fastapi.testclient import TestClient
+
+from app import combine_summary, history, server
+from app.models import CombinedAnswerRequest, CombinedAnswerResponse, Plan, PlanStep
+
+
+class FakeCompletions:
+    def __init__(self, content=None, exc=None):
+        self.content = content
+        self.exc = exc
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.exc is not None:
+            raise self.exc
+        message = type("Msg", (), {"content": self.content})
+        choice = type("Choice", (), {"message": message})
+        return type("Resp", (), {"choices": [choice]})
+
+
+def _client(completions):
+    return type("Client", (), {"chat": type("Chat", (), {"completions": completions})})
+
+
+def _req():
+    return CombinedAnswerRequest(
+        user_query="budget and tasks",
+        tool_outputs=[
+            {"agent": "budget_tracker_agent", "status": "success", "result": "Remaining: $10.00"},
+            {"agent": "task_dependency_agent", "status": "success", "result": "Design DB first"},
+        ],
+    )
+
+
+def _fallback(req):
+    return CombinedAnswerResponse(combined_answer="fallback")
+
+
+def test_combine_with_summary_parses_fused_json(monkeypatch):
+    completions = FakeCompletions(content='{"combined": " Both done. ", "summary": " User asked twice. "}')
+    monkeypatch.setattr(combine_summary, "get_openrouter_client", lambda: _client(completions))
+
+    resp = combine_summary.combine_with_summary(_req(), [])
+    assert resp.combined_answer == "Both done."
+    assert resp.history_summary == "User asked twice."
+
+
+def test_combine_with_summary_falls_back_on_bad_json(monkeypatch):
+    completions = FakeCompletions(content="not json")
+    monkeypatch.setattr(combine_summary, "get_openrouter_client", lambda: _client(completions))
+    monkeypatch.setattr(combine_summary, "combine_tool_outputs", _fallback)
+
+    resp = combine_summary.combine_with_summary(_req(), [])
+    assert resp.combined_answer == "fallback"
+    assert resp.history_summary is None
+
+
+def test_combine_with_summary_remembers_json_mode_rejection(monkeypatch):
+    class Rejected(Exception):
+        pass
+
+    completions = FakeCompletions(exc=Rejected("response_format json_object is not supported"))
+    monkeypatch.setattr(combine_summary, "get_openrouter_client", lambda: _client(completions))
+    monkeypatch.setattr(combine_summary, "combine_tool_outputs", _fallback)
+    monkeypatch.setattr(combine_summary, "BadRequestError", Rejected)
+    monkeypatch.setattr(combine_summary, "_JSON_MODE_UNSUPPORTED", set())
+
+    assert combine_summary.combine_with_summary(_req(), []).combined_answer == "fallback"
+    assert combine_summary.combine_with_summary(_req(), []).combined_answer == "fallback"
+    assert completions.calls == 1
+
+
+def test_combine_with_summary_other_bad_request_not_remembered(monkeypatch):
+    class Rejected(Exception):
+        pass
+
+    completions = FakeCompletions(exc=Rejected("maximum context length exceeded"))
+    monkeypatch.setattr(combine_summary, "get_openrouter_client", lambda: _client(completions))
+    monkeypatch.setattr(combine_summary, "combine_tool_outputs", _fallback)
+    monkeypatch.setattr(combine_summary, "BadRequestError", Rejected)
+    monkeypatch.setattr(combine_summary, "_JSON_MODE_UNSUPPORTED", set())
+
+    assert combine_summary.combine_with_summary(_req(), []).combined_answer == "fallback"
+    assert combine_summary.combine_with_summary(_req(), []).combined_answer == "fallback"
+    assert completions.calls == 2
+
+
+def test_fused_summary_primes_next_request(monkeypatch):
+    long_answer = "Combined: " + "x" * history.SHORT_HISTORY_CHARS
+    seen_history = []
+
+    async def fake_execute_plan(query, plan, registry, context, history=None):
+        return {}, [], CombinedAnswerResponse(combined_answer=long_answer, history_summary="primed summary")
+
+    def fake_plan_tools(query, registry, history=None):
+        seen_history.append(history)
+        return Plan(steps=[PlanStep(step_id=0, agent="budget_tracker_agent", intent="budget.check", input_source="user_query")])
+
+    # Any real summarization call would fail the test; only a cache hit succeeds.
+    completions = FakeCompletions(exc=AssertionError("summary should come from the cache"))
+    monkeypatch.setattr(history, "get_openrouter_client", lambda: _client(completions))
+    monkeypatch.setattr(history, "_SUMMARY_CACHE", type(history._SUMMARY_CACHE)())
+    monkeypatch.setattr(server, "execute_plan", fake_execute_plan)
+    monkeypatch.setattr(server, "plan_tools_with_llm", fake_plan_tools)
+
+    client = TestClient(server.app)
+    body = {"query": "check budget and task order", "conversation_id": "prime-test", "options": {"debug": False}}
+    assert client.post("/api/query", json=body).status_code == 200
+    assert client.post("/api/query", json=body).status_code == 200
+
+    assert seen_history == ["", "primed summary"]
+    assert completions.calls == 0
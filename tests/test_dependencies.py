@@ -1,7 +1,7 @@
 from fastapi.testclient import TestClient
 
 from app import server
-from app.models import AgentResponse, OutputModel, Plan, PlanStep
+from app.models import AgentResponse, CombinedAnswerResponse, OutputModel, Plan, PlanStep
 
 
 def test_dependency_response_formatted(monkeypatch):
@@ -10,7 +10,7 @@ def test_dependency_response_formatted(monkeypatch):
         "execution_order": ["2", "3", "1", "21", "28"],
     }
 
-    async def fake_execute_plan(query, plan, registry, context):
+    async def fake_execute_plan(query, plan, registry, context, history=None):
         step_outputs = {
             0: AgentResponse(
                 request_id="r1",
@@ -20,7 +20,7 @@ def test_dependency_response_formatted(monkeypatch):
                 error=None,
             )
         }
-        return step_outputs, []
+        return step_outputs, [], CombinedAnswerResponse(combined_answer="")
 
     def fake_plan_tools(query, registry, history=None):
         return Plan(
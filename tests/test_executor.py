@@ -0,0 +1,121 @@
+import asyncio
+
+from app import agent_caller, executor
+from app.executor import execute_plan, next_wave
+from app.models import AgentMetadata, AgentResponse, OutputModel, Plan, PlanStep
+
+
+def _step(step_id, input_source="user_query", agent="a", intent="summarize_text"):
+    return PlanStep(step_id=step_id, agent=agent, intent=intent, input_source=input_source)
+
+
+def test_next_wave_batches_independent_prefix():
+    steps = [_step(0), _step(1), _step(2, "step:0.output.result"), _step(3)]
+    ids = {s.step_id for s in steps}
+    wave = next_wave(steps, set(), ids)
+    assert [s.step_id for s in wave] == [0, 1]
+    wave = next_wave(steps[2:], {0, 1}, ids)
+    assert [s.step_id for s in wave] == [2, 3]
+
+
+def test_next_wave_runs_step_with_unresolvable_dependency():
+    steps = [_step(0, "step:1.output.result"), _step(1)]
+    wave = next_wave(steps, set(), {0, 1})
+    assert [s.step_id for s in wave] == [0]
+
+
+def test_next_wave_isolates_non_read_only_step():
+    steps = [_step(0), _step(1, intent="create_task"), _step(2)]
+    ids = {s.step_id for s in steps}
+    assert [s.step_id for s in next_wave(steps, set(), ids)] == [0]
+    assert [s.step_id for s in next_wave(steps[1:], {0}, ids)] == [1]
+    assert [s.step_id for s in next_wave(steps[2:], {0, 1}, ids)] == [2]
+
+
+def test_next_wave_orders_dependency_update_before_deadline_monitor():
+    steps = [
+        _step(0, agent="task_dependency_agent", intent="task.resolve_dependencies"),
+        _step(1, agent="deadline_guardian_agent", intent="deadline.monitor"),
+    ]
+    ids = {s.step_id for s in steps}
+    assert [s.step_id for s in next_wave(steps, set(), ids)] == [0]
+    assert [s.step_id for s in next_wave(steps[1:], {0}, ids)] == [1]
+
+
+def _record_calls(monkeypatch, agent_names):
+    events = []
+
+    async def fake_call_agent(agent_meta, intent, text, context, custom_input=None):
+        events.append(("start", agent_meta.name, intent))
+        await asyncio.sleep(0.01)
+        events.append(("end", agent_meta.name, intent))
+        return AgentResponse(
+            request_id="r",
+            agent_name=agent_meta.name,
+            status="success",
+            output=OutputModel(result=f"{agent_meta.name} done"),
+        )
+
+    monkeypatch.setattr(agent_caller, "call_agent", fake_call_agent)
+    monkeypatch.setattr(executor, "call_agent", fake_call_agent)
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    registry = [
+        AgentMetadata(name=name, description="test agent", intents=[], type="http")
+        for name in agent_names
+    ]
+    return events, registry
+
+
+def test_execute_plan_finishes_task_creation_before_next_step(monkeypatch):
+    events, registry = _record_calls(monkeypatch, ("KnowledgeBaseBuilderAgent", "task_dependency_agent"))
+    plan = Plan(
+        steps=[
+            _step(0, agent="KnowledgeBaseBuilderAgent", intent="create_task"),
+            _step(1, agent="task_dependency_agent", intent="task.resolve_dependencies"),
+        ]
+    )
+
+    asyncio.run(execute_plan("add tasks then order them", plan, registry, {}))
+
+    assert events == [
+        ("start", "KnowledgeBaseBuilderAgent", "create_task"),
+        ("end", "KnowledgeBaseBuilderAgent", "create_task"),
+        # auto-triggered TDA, then the planned TDA step
+        ("start", "task_dependency_agent", "task.resolve_dependencies"),
+        ("end", "task_dependency_agent", "task.resolve_dependencies"),
+        ("start", "task_dependency_agent", "task.resolve_dependencies"),
+        ("end", "task_dependency_agent", "task.resolve_dependencies"),
+    ]
+
+
+def test_execute_plan_updates_dependencies_before_deadline_monitor(monkeypatch):
+    events, registry = _record_calls(monkeypatch, ("task_dependency_agent", "deadline_guardian_agent"))
+    plan = Plan(
+        steps=[
+            _step(0, agent="task_dependency_agent", intent="task.resolve_dependencies"),
+            _step(1, agent="deadline_guardian_agent", intent="deadline.monitor"),
+        ]
+    )
+
+    asyncio.run(execute_plan("order tasks then check deadlines", plan, registry, {}))
+
+    assert events == [
+        ("start", "task_dependency_agent", "task.resolve_dependencies"),
+        ("end", "task_dependency_agent", "task.resolve_dependencies"),
+        ("start", "deadline_guardian_agent", "deadline.monitor"),
+        ("end", "deadline_guardian_agent", "deadline.monitor"),
+    ]
+
+
+def test_execute_plan_runs_read_only_steps_concurrently(monkeypatch):
+    events, registry = _record_calls(monkeypatch, ("document_summarizer_agent", "email_priority_agent"))
+    plan = Plan(
+        steps=[
+            _step(0, agent="document_summarizer_agent", intent="summarize_text"),
+            _step(1, agent="email_priority_agent", intent="email.priority.classify"),
+        ]
+    )
+
+    asyncio.run(execute_plan("summarize and classify", plan, registry, {}))
+
+    assert [kind for kind, _, _ in events] == ["start", "start", "end", "end"]
@@ -0,0 +1,38 @@
+from app import history
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = type("Msg", (), {"content": " summary text "})
+        choice = type("Choice", (), {"message": message})
+        return type("Resp", (), {"choices": [choice]})
+
+
+def test_summarize_history_memoizes_llm_result(monkeypatch):
+    completions = FakeCompletions()
+    fake_client = type("Client", (), {"chat": type("Chat", (), {"completions": completions})})
+    monkeypatch.setattr(history, "get_openrouter_client", lambda: fake_client)
+    monkeypatch.setattr(history, "_SUMMARY_CACHE", type(history._SUMMARY_CACHE)())
+
+    long_reply = "x" * history.SHORT_HISTORY_CHARS
+    turns = [{"role": "user", "content": "plan the sprint"}, {"role": "assistant", "content": long_reply}]
+    assert history.summarize_history(turns) == "summary text"
+    assert history.summarize_history(list(turns)) == "summary text"
+    assert completions.calls == 1
+
+
+def test_summarize_history_empty():
+    assert history.summarize_history([]) == ""
+
+
+def test_summarize_history_short_skips_llm(monkeypatch):
+    def no_client():
+        raise AssertionError("short history should not reach the LLM")
+
+    monkeypatch.setattr(history, "get_openrouter_client", no_client)
+    turns = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+    assert history.summarize_history(turns) == "Recent conversation: user: hi | assistant: hello"